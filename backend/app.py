@@ -1,29 +1,92 @@
 import os
+import json
 import time
-import uuid
+import hashlib
+import importlib.util
 import random
+import re
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 
+for _blas_threads_var in ["OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"]:
+    os.environ.setdefault(_blas_threads_var, "1")
+
 import numpy as np
 import cv2
 from flask import Flask, request, jsonify
+from flask_compress import Compress
 from flask_cors import CORS
 from deepface import DeepFace
 from werkzeug.utils import secure_filename
 
+from audit_stats import distribution_overlap, pair_distances
+
+try:
+    from turbojpeg import TurboJPEG
+
+    TURBO_JPEG = TurboJPEG()
+except Exception:
+    TURBO_JPEG = None
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+try:
+    import simsimd
+except Exception:
+    simsimd = None
+
+try:
+    import blake3
+except Exception:
+    blake3 = None
+
+try:
+    import onnxruntime as ort
+except Exception:
+    ort = None
+
+try:
+    import tensorflow as tf
+
+    GPU_DEVICES = tf.config.list_physical_devices("GPU")
+    for gpu in GPU_DEVICES:
+        tf.config.experimental.set_memory_growth(gpu, True)
+except Exception:
+    GPU_DEVICES = []
+
 app = Flask(__name__)
+app.config["COMPRESS_ALGORITHM"] = ["br", "gzip"]
+app.config["COMPRESS_MIN_SIZE"] = 1024
 CORS(app)
+Compress(app)
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 UPLOAD_FOLDER = os.path.join(BASE_DIR, "uploads")
 DATASET_PATH = os.path.join(BASE_DIR, "dataset")
+CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", os.path.join(BASE_DIR, "cache"))
 
-for folder in [UPLOAD_FOLDER, DATASET_PATH]:
+for folder in [UPLOAD_FOLDER, DATASET_PATH, CACHE_DIR]:
     os.makedirs(folder, exist_ok=True)
 
 MODEL_NAME = os.getenv("MODEL_NAME", "ArcFace")
-DETECTOR_BACKEND = os.getenv("DETECTOR_BACKEND", "opencv")
+DETECTOR_MODULES = {
+    "mediapipe": "mediapipe",
+    "mtcnn": "mtcnn",
+    "retinaface": "retinaface",
+    "dlib": "dlib",
+    "yolov8": "ultralytics",
+}
+DETECTOR_BACKEND = os.getenv("DETECTOR_BACKEND", "yunet")
+if DETECTOR_BACKEND == "yunet" and not hasattr(cv2, "FaceDetectorYN"):
+    DETECTOR_BACKEND = "opencv"
+elif DETECTOR_BACKEND in DETECTOR_MODULES and importlib.util.find_spec(DETECTOR_MODULES[DETECTOR_BACKEND]) is None:
+    DETECTOR_BACKEND = "opencv"
 STANDARD_THRESHOLD = float(os.getenv("STANDARD_THRESHOLD", "0.68"))
 
 DEFAULT_GROUP_DEFINITIONS = {
@@ -55,49 +118,93 @@ MIN_FACE_CONFIDENCE = float(os.getenv("MIN_FACE_CONFIDENCE", "0.30"))
 TARGET_FPR = float(os.getenv("TARGET_FPR", "0.01"))
 RNG_SEED = int(os.getenv("AUDIT_RANDOM_SEED", "1337"))
 
-ENABLE_PREPROCESSING = os.getenv("ENABLE_PREPROCESSING", "true").lower() in ("1", "true", "yes")
+TRUTHY_VALUES = frozenset(("1", "true", "yes"))
+
+ENABLE_PREPROCESSING = os.getenv("ENABLE_PREPROCESSING", "true").lower() in TRUTHY_VALUES
 PREPROCESS_METHOD = os.getenv("PREPROCESS_METHOD", "clahe_gamma")
 LOW_LIGHT_LUMINANCE = float(os.getenv("LOW_LIGHT_LUMINANCE", "70"))
 HIGH_LIGHT_LUMINANCE = float(os.getenv("HIGH_LIGHT_LUMINANCE", "170"))
 
 LOOKALIKE_DISTANCE_RATIO = float(os.getenv("LOOKALIKE_DISTANCE_RATIO", "0.55"))
-
-EMBEDDING_CACHE: Dict[Tuple[str, bool], Tuple[Optional[List[float]], dict]] = {}
+STANDARD_LOOKALIKE_THRESHOLD = STANDARD_THRESHOLD * LOOKALIKE_DISTANCE_RATIO
+
+WARMUP_MODELS = os.getenv("WARMUP_MODELS", "true").lower() in TRUTHY_VALUES
+SAVE_UPLOADS = os.getenv("SAVE_UPLOADS", "false").lower() in TRUTHY_VALUES
+
+ENABLE_EMBEDDING_CACHE = os.getenv("ENABLE_EMBEDDING_CACHE", "true").lower() in TRUTHY_VALUES
+REFERENCE_DTYPE = os.getenv("REFERENCE_DTYPE", "float16").lower()
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+ONNX_MODEL_PATH = os.getenv("ONNX_MODEL_PATH", "")
+UPLOAD_CACHE_SIZE = int(os.getenv("UPLOAD_CACHE_SIZE", "4096"))
+EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", str(min(8, os.cpu_count() or 1))))
+
+EMBEDDING_CACHE: Dict[Tuple[str, bool], Tuple[Optional[np.ndarray], dict]] = {}
+EMBEDDING_CACHE_LOCK = threading.Lock()
+UPLOAD_CACHE: "OrderedDict[bytes, Tuple[Optional[np.ndarray], dict]]" = OrderedDict()
+UPLOAD_CACHE_LOCK = threading.Lock()
+RECOGNITION_MODEL: Dict[str, object] = {}
+GAMMA_LUT_CACHE: Dict[float, np.ndarray] = {}
+CLAHE_LOCAL = threading.local()
+DIR_CACHE: Dict[str, Tuple[List[str], Optional[Tuple[int, ...]], Dict[str, List[str]]]] = {}
+GROUP_EMBEDDINGS: Dict[str, np.ndarray] = {}
+GROUP_CENTROIDS: Dict[str, Optional[np.ndarray]] = {}
+GROUP_REFERENCE_KEYS: Dict[str, str] = {}
+GROUP_LISTINGS: Dict[Tuple[str, object, bool], Tuple[Optional[int], List[str], str]] = {}
+REFERENCE_LOCK = threading.Lock()
+REFERENCE_CENTROIDS: Dict[str, object] = {
+    "keys": None,
+    "groups": [],
+    "matrix": None,
+    "sampleCounts": [],
+}
 AUDIT_CACHE: Dict[str, object] = {
     "timestamp": None,
     "group_thresholds": {},
+    "compare_thresholds": {},
     "calibration": {},
+    "response": None,
 }
 
 
-def _save_upload(file, prefix):
-    filename = secure_filename(file.filename or f"{prefix}.jpg")
-    request_id = uuid.uuid4().hex
-    temp_path = os.path.join(UPLOAD_FOLDER, f"{prefix}_{request_id}_{filename}")
-    file.save(temp_path)
-    return temp_path
+def _save_upload(data: bytes, filename: Optional[str], prefix: str):
+    extension = filename.rpartition(".")[2].lower() if filename and _is_image_file(filename) else "jpg"
+    upload_path = os.path.join(UPLOAD_FOLDER, f"{prefix}_{hashlib.sha1(data).hexdigest()}.{extension}")
+    if not os.path.exists(upload_path):
+        with open(upload_path, "wb") as handle:
+            handle.write(data)
+    return upload_path
 
 
-def _cleanup(paths):
-    if not paths:
-        return
-    if isinstance(paths, str):
-        paths = [paths]
-    for path in paths:
-        try:
-            os.remove(path)
-        except FileNotFoundError:
-            pass
+def _read_upload(file, prefix):
+    data = file.read()
+    if SAVE_UPLOADS and data:
+        _save_upload(data, file.filename, prefix)
+    return data
+
+
+def _hash_upload(data: bytes) -> bytes:
+    if blake3 is not None:
+        return blake3.blake3(data).digest()
+    return hashlib.blake2b(data, digest_size=32).digest()
+
+
+IMAGE_EXTENSIONS = frozenset(("jpg", "jpeg", "png"))
 
 
 def _is_image_file(filename: str) -> bool:
-    return filename.lower().endswith((".jpg", ".jpeg", ".png"))
+    return filename.rpartition(".")[2].lower() in IMAGE_EXTENSIONS
 
 
 def _list_images(folder):
-    if not os.path.isdir(folder):
+    try:
+        with os.scandir(folder) as entries:
+            images = [
+                entry.name
+                for entry in entries
+                if _is_image_file(entry.name) and entry.is_file()
+            ]
+    except (FileNotFoundError, NotADirectoryError):
         return []
-    images = [f for f in os.listdir(folder) if _is_image_file(f)]
     images.sort()
     return images
 
@@ -118,18 +225,46 @@ def _format_bounding_box(area):
     return {"x": x, "y": y, "width": w, "height": h}
 
 
+def _decode_image(data: bytes):
+    if not data:
+        return None
+    if TURBO_JPEG is not None and data[:3] == b"\xff\xd8\xff" and b"Exif\x00\x00" not in data[:65536]:
+        try:
+            return TURBO_JPEG.decode(data)
+        except Exception:
+            pass
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
 def _read_image(img_path: str):
     try:
-        return cv2.imread(img_path)
+        with open(img_path, "rb") as handle:
+            return _decode_image(handle.read())
     except Exception:
         return None
 
 
+def _prefetch_files(paths: List[str]):
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
 def _estimate_luminance(img) -> Optional[float]:
     if img is None:
         return None
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    return float(np.mean(gray))
+    blue, green, red, _ = cv2.mean(img[::4, ::4])
+    return float(0.114 * blue + 0.587 * green + 0.299 * red)
 
 
 def _bucket_luminance(mean_luminance: Optional[float]) -> str:
@@ -143,28 +278,41 @@ def _bucket_luminance(mean_luminance: Optional[float]) -> str:
 
 
 def _apply_gamma(img, gamma: float):
-    if gamma <= 0:
+    if gamma <= 0 or gamma == 1.0:
         return img
-    inv_gamma = 1.0 / gamma
-    table = np.array([((i / 255.0) ** inv_gamma) * 255 for i in range(256)]).astype("uint8")
+    gamma = round(gamma, 2)
+    table = GAMMA_LUT_CACHE.get(gamma)
+    if table is None:
+        table = (np.linspace(0.0, 1.0, 256) ** (1.0 / gamma) * 255).astype(np.uint8)
+        GAMMA_LUT_CACHE[gamma] = table
     return cv2.LUT(img, table)
 
 
+def _clahe():
+    clahe = getattr(CLAHE_LOCAL, "clahe", None)
+    if clahe is None:
+        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+        CLAHE_LOCAL.clahe = clahe
+    return clahe
+
+
 def _apply_clahe(img):
+    return _apply_clahe_gamma(img, 1.0)
+
+
+def _apply_clahe_gamma(img, gamma: float):
     lab = cv2.cvtColor(img, cv2.COLOR_BGR2LAB)
     l_channel, a_channel, b_channel = cv2.split(lab)
-    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-    l_clahe = clahe.apply(l_channel)
+    l_clahe = _apply_gamma(_clahe().apply(l_channel), gamma)
     merged = cv2.merge((l_clahe, a_channel, b_channel))
     return cv2.cvtColor(merged, cv2.COLOR_LAB2BGR)
 
 
 def _apply_hist_eq(img):
     ycrcb = cv2.cvtColor(img, cv2.COLOR_BGR2YCrCb)
-    y_channel, cr_channel, cb_channel = cv2.split(ycrcb)
-    y_eq = cv2.equalizeHist(y_channel)
-    merged = cv2.merge((y_eq, cr_channel, cb_channel))
-    return cv2.cvtColor(merged, cv2.COLOR_YCrCb2BGR)
+    y_eq = cv2.equalizeHist(cv2.extractChannel(ycrcb, 0))
+    cv2.insertChannel(y_eq, ycrcb, 0)
+    return cv2.cvtColor(ycrcb, cv2.COLOR_YCrCb2BGR, dst=ycrcb)
 
 
 def _normalize_illumination(img, mean_luminance: Optional[float]):
@@ -184,11 +332,13 @@ def _normalize_illumination(img, mean_luminance: Optional[float]):
             gamma = 1.05
 
     processed = img.copy()
-    if method in ("clahe", "clahe_gamma", "clahe+gamma"):
+    if method in ("clahe_gamma", "clahe+gamma"):
+        processed = _apply_clahe_gamma(processed, gamma)
+    if method == "clahe":
         processed = _apply_clahe(processed)
     if method in ("hist_eq", "histogram"):
         processed = _apply_hist_eq(processed)
-    if method in ("gamma", "clahe_gamma", "clahe+gamma"):
+    if method == "gamma":
         processed = _apply_gamma(processed, gamma)
 
     return processed, {
@@ -198,28 +348,15 @@ def _normalize_illumination(img, mean_luminance: Optional[float]):
     }
 
 
-def _write_temp_image(img, prefix: str) -> Optional[str]:
-    request_id = uuid.uuid4().hex
-    temp_path = os.path.join(UPLOAD_FOLDER, f"{prefix}_{request_id}.jpg")
-    try:
-        success = cv2.imwrite(temp_path, img)
-        if not success:
-            return None
-        return temp_path
-    except Exception:
-        return None
-
-
-def _prepare_variants(img_path: str, use_preprocessing: bool):
-    temp_paths = []
-    img = _read_image(img_path)
+def _prepare_variants(image, use_preprocessing: bool):
+    img = image if isinstance(image, np.ndarray) else _read_image(image)
     mean_luminance = _estimate_luminance(img)
     bucket = _bucket_luminance(mean_luminance)
 
     variants = [
         {
             "label": "original",
-            "path": img_path,
+            "image": img if img is not None else image,
             "preprocess": {"applied": False, "method": "none"},
             "luminance": mean_luminance,
             "bucket": bucket,
@@ -229,25 +366,22 @@ def _prepare_variants(img_path: str, use_preprocessing: bool):
     if use_preprocessing and img is not None and ENABLE_PREPROCESSING:
         normalized, preprocess_info = _normalize_illumination(img, mean_luminance)
         if normalized is not None:
-            temp_path = _write_temp_image(normalized, "normalized")
-            if temp_path:
-                temp_paths.append(temp_path)
-                variants.append(
-                    {
-                        "label": "normalized",
-                        "path": temp_path,
-                        "preprocess": preprocess_info,
-                        "luminance": mean_luminance,
-                        "bucket": bucket,
-                    }
-                )
+            variants.append(
+                {
+                    "label": "normalized",
+                    "image": normalized,
+                    "preprocess": preprocess_info,
+                    "luminance": mean_luminance,
+                    "bucket": bucket,
+                }
+            )
 
     illumination = {
         "meanLuminance": mean_luminance,
         "bucket": bucket,
     }
 
-    return variants, illumination, temp_paths
+    return variants, illumination
 
 
 def _detector_backends():
@@ -257,10 +391,10 @@ def _detector_backends():
     return backends
 
 
-def _extract_faces(img_path: str, detector_backend: str):
+def _extract_faces(image, detector_backend: str):
     try:
         return DeepFace.extract_faces(
-            img_path=img_path,
+            img_path=image,
             detector_backend=detector_backend,
             enforce_detection=False,
             align=True,
@@ -269,10 +403,10 @@ def _extract_faces(img_path: str, detector_backend: str):
         return []
 
 
-def _detect_face_on_path(img_path: str):
+def _detect_face(image):
     best = {"detected": False, "confidence": 0.0, "area": None, "backend": None}
     for backend in _detector_backends():
-        faces = _extract_faces(img_path, backend)
+        faces = _extract_faces(image, backend)
         if not faces:
             continue
         for face in faces:
@@ -286,11 +420,12 @@ def _detect_face_on_path(img_path: str):
                     "confidence": confidence,
                     "area": area,
                     "backend": backend,
+                    "face": face.get("face"),
                 }
     return best
 
 
-def _represent_face(img_path: str, detector_backend: Optional[str]):
+def _represent_face(image, detector_backend: Optional[str]):
     backends = [detector_backend] if detector_backend else []
     for backend in _detector_backends():
         if backend not in backends:
@@ -299,37 +434,124 @@ def _represent_face(img_path: str, detector_backend: Optional[str]):
     for backend in backends:
         try:
             representations = DeepFace.represent(
-                img_path=img_path,
+                img_path=image,
                 model_name=MODEL_NAME,
                 detector_backend=backend,
                 enforce_detection=False,
             )
             if representations:
-                return representations[0].get("embedding")
+                return _l2_normalize(representations[0].get("embedding"))
         except Exception:
             continue
     return None
 
 
+def _recognition_model():
+    if MODEL_NAME not in RECOGNITION_MODEL:
+        RECOGNITION_MODEL[MODEL_NAME] = DeepFace.build_model(MODEL_NAME)
+    return RECOGNITION_MODEL[MODEL_NAME]
+
+
+def _onnx_session():
+    if "onnx" not in RECOGNITION_MODEL:
+        session = None
+        if ort is not None and ONNX_MODEL_PATH and os.path.exists(ONNX_MODEL_PATH):
+            available = ort.get_available_providers()
+            providers = [
+                provider
+                for provider in ("CUDAExecutionProvider", "CPUExecutionProvider")
+                if provider in available
+            ]
+            try:
+                session = ort.InferenceSession(ONNX_MODEL_PATH, providers=providers)
+            except Exception:
+                session = None
+        RECOGNITION_MODEL["onnx"] = session
+    return RECOGNITION_MODEL["onnx"]
+
+
+def _recognition_runtime() -> str:
+    if "runtime" not in RECOGNITION_MODEL:
+        runtime = "keras"
+        if _onnx_session() is not None:
+            try:
+                mtime_ns = os.stat(ONNX_MODEL_PATH).st_mtime_ns
+            except OSError:
+                mtime_ns = 0
+            runtime = f"onnx:{os.path.abspath(ONNX_MODEL_PATH)}:{mtime_ns}"
+        RECOGNITION_MODEL["runtime"] = runtime
+    return RECOGNITION_MODEL["runtime"]
+
+
+def _resize_face(face: np.ndarray, target_size: Tuple[int, int]) -> np.ndarray:
+    factor = min(target_size[0] / face.shape[0], target_size[1] / face.shape[1])
+    resized = cv2.resize(face, (int(face.shape[1] * factor), int(face.shape[0] * factor)))
+    diff_h = target_size[0] - resized.shape[0]
+    diff_w = target_size[1] - resized.shape[1]
+    resized = np.pad(
+        resized,
+        ((diff_h // 2, diff_h - diff_h // 2), (diff_w // 2, diff_w - diff_w // 2), (0, 0)),
+        "constant",
+    )
+    if resized.shape[0:2] != tuple(target_size):
+        resized = cv2.resize(resized, (target_size[1], target_size[0]))
+    resized = resized.astype(np.float32)
+    if resized.max() > 1:
+        resized /= 255.0
+    return resized
+
+
+def _represent_batch(faces: List[np.ndarray]) -> List[Optional[np.ndarray]]:
+    if not faces:
+        return []
+    try:
+        session = _onnx_session()
+        if session is not None:
+            session_input = session.get_inputs()[0]
+            channels_first = session_input.shape[1] == 3
+            target_size = tuple(session_input.shape[2:4] if channels_first else session_input.shape[1:3])
+        else:
+            model = _recognition_model()
+            target_size = tuple(model.input_shape)
+        batch_size = max(1, EMBEDDING_BATCH_SIZE)
+        embeddings = []
+        for start in range(0, len(faces), batch_size):
+            batch = np.stack(
+                [_resize_face(face[:, :, ::-1], target_size) for face in faces[start:start + batch_size]]
+            )
+            if session is not None:
+                if channels_first:
+                    batch = np.ascontiguousarray(batch.transpose(0, 3, 1, 2))
+                output = session.run(None, {session_input.name: batch})[0]
+            else:
+                output = model.model(batch, training=False).numpy()
+            embeddings.extend(_l2_normalize(output))
+        return embeddings
+    except Exception:
+        return [None] * len(faces)
+
+
+def _warm_up_models():
+    dummy = np.zeros((112, 112, 3), dtype=np.uint8)
+    for backend in _detector_backends():
+        _extract_faces(dummy, backend)
+    _represent_batch([dummy])
+
+
 def _select_best_variant(variants):
     best_variant = variants[0]
     best_detection = {"detected": False, "confidence": 0.0, "area": None, "backend": None}
     for variant in variants:
-        detection = _detect_face_on_path(variant["path"])
+        detection = _detect_face(variant["image"])
         if detection["confidence"] > best_detection["confidence"]:
             best_detection = detection
             best_variant = variant
     return best_variant, best_detection
 
 
-def _get_embedding_with_metadata(img_path: str, use_preprocessing: bool = True):
-    variants, illumination, temp_paths = _prepare_variants(img_path, use_preprocessing)
+def _detect_prepared(variants, illumination):
     selected_variant, detection = _select_best_variant(variants)
 
-    embedding = None
-    if detection["detected"]:
-        embedding = _represent_face(selected_variant["path"], detection["backend"])
-
     metadata = {
         "detected": bool(detection["detected"]),
         "confidence": float(detection["confidence"] or 0.0),
@@ -343,25 +565,202 @@ def _get_embedding_with_metadata(img_path: str, use_preprocessing: bool = True):
             "variant": selected_variant["label"],
         },
     }
+    return selected_variant, detection, metadata
+
+
+def _get_embeddings_batch(
+    images: list, use_preprocessing: bool, require_all: bool = False, skip_recognition: bool = False
+):
+    results = []
+    faces = []
+    detected = []
+    paths = [image for image in images if isinstance(image, str)]
+    if paths:
+        threading.Thread(target=_prefetch_files, args=(paths,), daemon=True).start()
+
+    def detect_next():
+        variants, illumination = in_flight.popleft().result()
+        selected_variant, detection, metadata = _detect_prepared(variants, illumination)
+        if detection["detected"]:
+            faces.append(detection.get("face"))
+            detected.append((len(results), detection["backend"], selected_variant["image"]))
+        results.append([None, metadata])
+
+    workers = max(1, min(EMBEDDING_WORKERS, len(images)))
+    in_flight = deque()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for image in images:
+            in_flight.append(executor.submit(_prepare_variants, image, use_preprocessing))
+            if len(in_flight) >= 2 * workers:
+                detect_next()
+        while in_flight:
+            detect_next()
+
+    if skip_recognition or (require_all and len(detected) < len(images)):
+        return [(None, metadata) for _, metadata in results]
+
+    embeddings = iter(_represent_batch([face for face in faces if face is not None]))
+    for (index, backend, variant_image), face in zip(detected, faces):
+        embedding = next(embeddings) if face is not None else None
+        if embedding is None and _onnx_session() is None:
+            embedding = _represent_face(variant_image, backend)
+        results[index][0] = embedding
+    return [(embedding, metadata) for embedding, metadata in results]
+
+
+def _embedding_settings(use_preprocessing: bool) -> str:
+    preprocess = PREPROCESS_METHOD if use_preprocessing and ENABLE_PREPROCESSING else "none"
+    return "|".join(
+        [MODEL_NAME, _recognition_runtime(), DETECTOR_BACKEND, str(MIN_FACE_CONFIDENCE), preprocess, "unit", "bgr"]
+    )
+
+
+def _embedding_cache_key(img_path: str, use_preprocessing: bool) -> Optional[str]:
+    try:
+        stat = os.stat(img_path)
+    except OSError:
+        return None
+    settings = "|".join(
+        [
+            os.path.abspath(img_path),
+            str(stat.st_mtime_ns),
+            str(stat.st_size),
+            _embedding_settings(use_preprocessing),
+        ]
+    )
+    return hashlib.blake2b(settings.encode("utf-8"), digest_size=32).hexdigest()
+
 
-    _cleanup(temp_paths)
+def _embedding_cache_paths(cache_key: str) -> Tuple[str, str]:
+    base = os.path.join(CACHE_DIR, cache_key)
+    return f"{base}.npy", f"{base}.json"
+
+
+def _load_disk_embedding(cache_key: str):
+    embedding_path, metadata_path = _embedding_cache_paths(cache_key)
+    if not os.path.exists(metadata_path):
+        return None
+    try:
+        with open(metadata_path, "r", encoding="utf-8") as handle:
+            metadata = json.load(handle)
+        embedding = None
+        if os.path.exists(embedding_path):
+            embedding = np.ascontiguousarray(np.load(embedding_path), dtype=np.float16)
+    except (OSError, ValueError):
+        return None
     return embedding, metadata
 
 
-def _get_cached_embedding(img_path: str, use_preprocessing: bool):
+def _write_atomic(path: str, write):
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, "wb") as handle:
+            write(handle)
+        os.replace(temp_path, path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _store_disk_embedding(cache_key: str, embedding, metadata: dict):
+    embedding_path, metadata_path = _embedding_cache_paths(cache_key)
+    try:
+        if embedding is not None:
+            _write_atomic(embedding_path, lambda handle: np.save(handle, np.asarray(embedding, dtype=np.float16)))
+        _write_atomic(metadata_path, lambda handle: handle.write(json.dumps(metadata).encode("utf-8")))
+    except OSError:
+        pass
+
+
+def _is_settled(embedding, metadata: dict) -> bool:
+    return embedding is not None or not metadata.get("detected")
+
+
+def _lookup_cached_embedding(img_path: str, use_preprocessing: bool):
     key = (img_path, bool(use_preprocessing))
-    if key in EMBEDDING_CACHE:
-        return EMBEDDING_CACHE[key]
-    embedding, metadata = _get_embedding_with_metadata(img_path, use_preprocessing)
-    EMBEDDING_CACHE[key] = (embedding, metadata)
-    return embedding, metadata
+    with EMBEDDING_CACHE_LOCK:
+        cached = EMBEDDING_CACHE.get(key)
+    if cached is not None:
+        return None, cached
+
+    cache_key = _embedding_cache_key(img_path, use_preprocessing) if ENABLE_EMBEDDING_CACHE else None
+    cached = _load_disk_embedding(cache_key) if cache_key else None
+    if cached is not None:
+        with EMBEDDING_CACHE_LOCK:
+            EMBEDDING_CACHE[key] = cached
+    return cache_key, cached
+
+
+def _get_cached_embeddings(img_paths: List[str], use_preprocessing: bool):
+    with ThreadPoolExecutor(max_workers=max(1, EMBEDDING_WORKERS)) as executor:
+        lookups = list(
+            executor.map(_lookup_cached_embedding, img_paths, [use_preprocessing] * len(img_paths))
+        )
+    results = [cached for _, cached in lookups]
+    pending = [index for index, cached in enumerate(results) if cached is None]
+
+    if pending:
+        computed = _get_embeddings_batch([img_paths[index] for index in pending], use_preprocessing)
+        for index, (embedding, metadata) in zip(pending, computed):
+            if embedding is not None:
+                embedding = embedding.astype(np.float16)
+            results[index] = (embedding, metadata)
+        settled = [index for index in pending if _is_settled(*results[index])]
+        for index in settled:
+            cache_key = lookups[index][0]
+            if cache_key:
+                _store_disk_embedding(cache_key, *results[index])
+        with EMBEDDING_CACHE_LOCK:
+            for index in settled:
+                EMBEDDING_CACHE[(img_paths[index], bool(use_preprocessing))] = results[index]
+
+    return results
+
+
+def _get_upload_embeddings(uploads: List[bytes], require_all: bool = False):
+    keys = [_hash_upload(data) for data in uploads]
+    with UPLOAD_CACHE_LOCK:
+        results = [UPLOAD_CACHE.get(key) for key in keys]
+        for key, cached in zip(keys, results):
+            if cached is not None:
+                UPLOAD_CACHE.move_to_end(key)
+    pending = [index for index, cached in enumerate(results) if cached is None]
+    if not pending:
+        return results
+    skip_recognition = require_all and any(
+        cached is not None and not cached[1].get("detected") for cached in results
+    )
+
+    images = [_decode_image(uploads[index]) for index in pending]
+    if any(image is None for image in images):
+        return None
+
+    computed = _get_embeddings_batch(
+        images, use_preprocessing=True, require_all=require_all, skip_recognition=skip_recognition
+    )
+    with UPLOAD_CACHE_LOCK:
+        for index, (embedding, metadata) in zip(pending, computed):
+            results[index] = (embedding, metadata)
+            if UPLOAD_CACHE_SIZE > 0 and _is_settled(embedding, metadata):
+                UPLOAD_CACHE[keys[index]] = results[index]
+        while len(UPLOAD_CACHE) > UPLOAD_CACHE_SIZE:
+            UPLOAD_CACHE.popitem(last=False)
+    return results
+
+
+def _cosine_distance(vec_a: np.ndarray, vec_b: np.ndarray) -> float:
+    if simsimd is not None:
+        return float(simsimd.cosine(vec_a, vec_b))
+    return 1.0 - float(vec_a @ vec_b)
 
 
-def _cosine_distance(vec_a, vec_b):
-    a = np.asarray(vec_a, dtype=np.float32)
-    b = np.asarray(vec_b, dtype=np.float32)
-    denom = (np.linalg.norm(a) * np.linalg.norm(b)) + 1e-9
-    return float(1.0 - float(np.dot(a, b) / denom))
+def _l2_normalize(vectors):
+    arr = np.array(vectors, dtype=np.float32, order="C")
+    arr /= np.linalg.norm(arr, axis=-1, keepdims=True) + 1e-9
+    return arr
 
 
 def _calibrated_similarity(distance: float, threshold: float):
@@ -371,48 +770,15 @@ def _calibrated_similarity(distance: float, threshold: float):
     return float(min(max(score, 0.0), 1.0))
 
 
-def _iter_genuine_pairs(embeddings_by_identity: Dict[str, List[List[float]]]):
-    for embeds in embeddings_by_identity.values():
-        if len(embeds) < 2:
-            continue
-        for i in range(len(embeds)):
-            for j in range(i + 1, len(embeds)):
-                yield embeds[i], embeds[j]
-
-
-def _iter_impostor_pairs(embeddings_by_identity: Dict[str, List[List[float]]]):
-    identities = list(embeddings_by_identity.items())
-    for i in range(len(identities)):
-        _, embeds_a = identities[i]
-        for j in range(i + 1, len(identities)):
-            _, embeds_b = identities[j]
-            for emb_a in embeds_a:
-                for emb_b in embeds_b:
-                    yield emb_a, emb_b
-
-
-def _sample_distances(pair_iter, max_pairs: int, rng: random.Random):
-    distances = []
-    if max_pairs <= 0:
-        for emb_a, emb_b in pair_iter:
-            distances.append(_cosine_distance(emb_a, emb_b))
-        return distances
-
-    seen = 0
-    for emb_a, emb_b in pair_iter:
-        distance = _cosine_distance(emb_a, emb_b)
-        if len(distances) < max_pairs:
-            distances.append(distance)
-        else:
-            idx = rng.randint(0, seen)
-            if idx < max_pairs:
-                distances[idx] = distance
-        seen += 1
-    return distances
+def _sample_distances(distances: np.ndarray, max_pairs: int, rng: random.Random):
+    if 0 < max_pairs < distances.size:
+        generator = np.random.default_rng(rng.getrandbits(64))
+        distances = generator.choice(distances, size=max_pairs, replace=False)
+    return np.ascontiguousarray(distances, dtype=np.float32)
 
 
-def _distribution_stats(distances: List[float], bins: int = 20):
-    if not distances:
+def _distribution_stats(distances: np.ndarray, bins: int = 20):
+    if distances.size == 0:
         return {
             "count": 0,
             "mean": None,
@@ -424,22 +790,22 @@ def _distribution_stats(distances: List[float], bins: int = 20):
             "p90": None,
             "histogram": {"bins": [], "counts": []},
         }
-    arr = np.asarray(distances, dtype=np.float32)
-    counts, edges = np.histogram(arr, bins=bins, range=(0, 1))
+    counts, edges = np.histogram(distances, bins=bins, range=(0, 1))
+    minimum, p10, p50, p90, maximum = np.percentile(distances, [0, 10, 50, 90, 100])
     return {
-        "count": int(len(arr)),
-        "mean": float(np.mean(arr)),
-        "std": float(np.std(arr)),
-        "min": float(np.min(arr)),
-        "max": float(np.max(arr)),
-        "p10": float(np.percentile(arr, 10)),
-        "p50": float(np.percentile(arr, 50)),
-        "p90": float(np.percentile(arr, 90)),
+        "count": int(len(distances)),
+        "mean": float(np.mean(distances)),
+        "std": float(np.std(distances)),
+        "min": float(minimum),
+        "max": float(maximum),
+        "p10": float(p10),
+        "p50": float(p50),
+        "p90": float(p90),
         "histogram": {"bins": edges.tolist(), "counts": counts.tolist()},
     }
 
 
-def _compute_metrics(genuine: List[float], impostor: List[float], threshold: float):
+def _compute_metrics(genuine: np.ndarray, impostor: np.ndarray, threshold: float):
     metrics = {
         "threshold": float(threshold),
         "fpr": None,
@@ -449,71 +815,81 @@ def _compute_metrics(genuine: List[float], impostor: List[float], threshold: flo
         "accuracy": None,
         "balancedAccuracy": None,
     }
-    if not genuine and not impostor:
+    if genuine.size == 0 and impostor.size == 0:
         return metrics
 
-    if impostor:
-        fpr = sum(1 for d in impostor if d <= threshold) / len(impostor)
+    if impostor.size:
+        fpr = np.count_nonzero(impostor <= threshold) / impostor.size
         metrics["fpr"] = float(fpr)
         metrics["tnr"] = float(1.0 - fpr)
 
-    if genuine:
-        fnr = sum(1 for d in genuine if d > threshold) / len(genuine)
+    if genuine.size:
+        fnr = np.count_nonzero(genuine > threshold) / genuine.size
         metrics["fnr"] = float(fnr)
         metrics["tpr"] = float(1.0 - fnr)
 
-    if genuine and impostor:
+    if genuine.size and impostor.size:
         tpr = metrics["tpr"] if metrics["tpr"] is not None else 0.0
         tnr = metrics["tnr"] if metrics["tnr"] is not None else 0.0
         metrics["accuracy"] = float(
-            (tpr * len(genuine) + tnr * len(impostor)) / (len(genuine) + len(impostor))
+            (tpr * genuine.size + tnr * impostor.size) / (genuine.size + impostor.size)
         )
         metrics["balancedAccuracy"] = float((tpr + tnr) / 2.0)
     return metrics
 
 
-def _threshold_for_target_fpr(impostor: List[float], target_fpr: float, fallback: float):
-    if not impostor:
+def _threshold_for_target_fpr(impostor: np.ndarray, target_fpr: float, fallback: float):
+    if impostor.size == 0:
         return fallback
     target = min(max(target_fpr, 0.001), 0.2)
-    return float(np.quantile(np.asarray(impostor, dtype=np.float32), target))
-
-
-def _distribution_overlap(genuine: List[float], impostor: List[float], bins: int = 20):
-    if not genuine or not impostor:
-        return None
-    g_counts, edges = np.histogram(genuine, bins=bins, range=(0, 1), density=True)
-    i_counts, _ = np.histogram(impostor, bins=edges, density=True)
-    bin_width = edges[1] - edges[0]
-    overlap = float(np.sum(np.minimum(g_counts, i_counts)) * bin_width)
-    return overlap
+    return float(np.quantile(impostor, target))
 
 
-def _d_prime(genuine: List[float], impostor: List[float]):
-    if not genuine or not impostor:
+def _d_prime(genuine: np.ndarray, impostor: np.ndarray):
+    if genuine.size == 0 or impostor.size == 0:
         return None
-    g = np.asarray(genuine, dtype=np.float32)
-    i = np.asarray(impostor, dtype=np.float32)
-    mean_diff = np.mean(i) - np.mean(g)
-    pooled_std = np.sqrt(0.5 * (np.var(i) + np.var(g)) + 1e-9)
+    mean_diff = np.mean(impostor) - np.mean(genuine)
+    pooled_std = np.sqrt(0.5 * (np.var(impostor) + np.var(genuine)) + 1e-9)
     if pooled_std <= 0:
         return None
     return float(mean_diff / pooled_std)
 
 
-def _collect_identities(group_folder: str, max_samples: int, rng: random.Random):
+def _folder_signature(folders: List[str]) -> Optional[Tuple[int, ...]]:
+    try:
+        return tuple(os.stat(folder).st_mtime_ns for folder in folders)
+    except OSError:
+        return None
+
+
+def _scan_identities(group_folder: str) -> Dict[str, List[str]]:
+    cached = DIR_CACHE.get(group_folder)
+    if cached is not None:
+        folders, signature, identities = cached
+        if signature is not None and _folder_signature(folders) == signature:
+            return identities
+
     identities = {}
-    identity_dirs = [entry for entry in os.scandir(group_folder) if entry.is_dir()]
+    with os.scandir(group_folder) as entries:
+        identity_dirs = sorted((entry.name, entry.path) for entry in entries if entry.is_dir())
     if identity_dirs:
-        for entry in sorted(identity_dirs, key=lambda e: e.name):
-            images = _list_image_paths(entry.path)
+        for name, path in identity_dirs:
+            images = _list_image_paths(path)
             if images:
-                identities[entry.name] = images
+                identities[name] = images
     else:
         for image_path in _list_image_paths(group_folder):
             identity_key = os.path.splitext(os.path.basename(image_path))[0]
             identities[identity_key] = [image_path]
 
+    folders = [group_folder] + [path for _, path in identity_dirs]
+    DIR_CACHE[group_folder] = (folders, _folder_signature(folders), identities)
+    return identities
+
+
+def _collect_identities(group_folder: str, max_samples: int, rng: random.Random):
+    identities = _scan_identities(group_folder)
+
     if max_samples and max_samples > 0:
         identities = _limit_identity_samples(identities, max_samples, rng)
 
@@ -539,8 +915,8 @@ def _limit_identity_samples(identities: Dict[str, List[str]], max_samples: int,
     return trimmed
 
 
-def _embed_identities(identities: Dict[str, List[str]], use_preprocessing: bool):
-    embeddings_by_identity: Dict[str, List[List[float]]] = {}
+def _embed_identities(identities: Dict[str, List[str]], results: List[Tuple[Optional[np.ndarray], dict]]):
+    embeddings_by_identity: Dict[str, List[np.ndarray]] = {}
     detection_total = 0
     detected_count = 0
     preprocessing_used = 0
@@ -552,28 +928,28 @@ def _embed_identities(identities: Dict[str, List[str]], use_preprocessing: bool)
         "unknown": {"count": 0, "detected": 0},
     }
 
-    for identity, paths in identities.items():
-        for path in paths:
-            detection_total += 1
-            embedding, metadata = _get_cached_embedding(path, use_preprocessing)
-            illumination = metadata.get("illumination", {})
-            bucket = illumination.get("bucket", "unknown")
-            buckets.setdefault(bucket, {"count": 0, "detected": 0})
-            buckets[bucket]["count"] += 1
+    samples = [identity for identity, paths in identities.items() for _ in paths]
 
-            if illumination.get("meanLuminance") is not None:
-                luminance_values.append(float(illumination["meanLuminance"]))
+    for identity, (embedding, metadata) in zip(samples, results):
+        detection_total += 1
+        illumination = metadata.get("illumination", {})
+        bucket = illumination.get("bucket", "unknown")
+        buckets.setdefault(bucket, {"count": 0, "detected": 0})
+        buckets[bucket]["count"] += 1
 
-            if metadata.get("detected"):
-                detected_count += 1
-                buckets[bucket]["detected"] += 1
+        if illumination.get("meanLuminance") is not None:
+            luminance_values.append(float(illumination["meanLuminance"]))
 
-            preprocessing = metadata.get("preprocessing", {})
-            if preprocessing.get("applied") and preprocessing.get("variant") == "normalized":
-                preprocessing_used += 1
+        if metadata.get("detected"):
+            detected_count += 1
+            buckets[bucket]["detected"] += 1
 
-            if embedding is not None:
-                embeddings_by_identity.setdefault(identity, []).append(embedding)
+        preprocessing = metadata.get("preprocessing", {})
+        if preprocessing.get("applied") and preprocessing.get("variant") == "normalized":
+            preprocessing_used += 1
+
+        if embedding is not None:
+            embeddings_by_identity.setdefault(identity, []).append(embedding)
 
     embeddings_by_identity = {
         identity: embeds
@@ -617,41 +993,36 @@ def _interpret_group(metrics: dict, detection_rate: float):
     return "high_bias", "Low separation; consider threshold tuning and data quality improvements."
 
 
-def _audit_group(group: str, group_folder: str, threshold: float, use_preprocessing: bool, max_pairs: int, rng: random.Random):
-    identities = _collect_identities(group_folder, MAX_AUDIT_SAMPLES_PER_GROUP, rng)
-    if not identities:
-        return None
-
-    embeddings_by_identity, detection_stats = _embed_identities(identities, use_preprocessing)
+def _audit_group(group: str, identities: Dict[str, List[str]], results, threshold: float, max_pairs: int, rng: random.Random):
+    embeddings_by_identity, detection_stats = _embed_identities(identities, results)
     identity_count = len(embeddings_by_identity)
     all_embeddings = [emb for embeds in embeddings_by_identity.values() for emb in embeds]
+    counts = [len(embeds) for embeds in embeddings_by_identity.values()]
+    embeddings = np.stack(all_embeddings).astype(np.float32) if all_embeddings else None
 
     warnings = []
     if identity_count < 2:
         warnings.append("Need at least two identities to compute impostor pairs.")
-    genuine_pairs_iter = _iter_genuine_pairs(embeddings_by_identity)
-    impostor_pairs_iter = _iter_impostor_pairs(embeddings_by_identity)
+    genuine_pairs, impostor_pairs = pair_distances(embeddings, counts, max_pairs, rng)
 
-    genuine_distances = _sample_distances(genuine_pairs_iter, max_pairs, rng)
-    impostor_distances = _sample_distances(impostor_pairs_iter, max_pairs, rng)
+    genuine_distances = _sample_distances(genuine_pairs, max_pairs, rng)
+    impostor_distances = _sample_distances(impostor_pairs, max_pairs, rng)
 
-    if not genuine_distances:
+    if genuine_distances.size == 0:
         warnings.append("Insufficient same-identity pairs for FNR and TPR metrics.")
-    if not impostor_distances:
+    if impostor_distances.size == 0:
         warnings.append("Insufficient different-identity pairs for FPR and TNR metrics.")
 
     centroid_distance = None
-    if all_embeddings:
-        centroid = np.mean(np.asarray(all_embeddings, dtype=np.float32), axis=0)
-        centroid_distance = float(
-            np.mean([_cosine_distance(emb, centroid) for emb in all_embeddings])
-        )
+    if embeddings is not None:
+        centroid = _group_centroid(embeddings)
+        centroid_distance = float(np.mean(1.0 - embeddings @ centroid))
 
     baseline_metrics = _compute_metrics(genuine_distances, impostor_distances, threshold)
     adaptive_threshold = _threshold_for_target_fpr(impostor_distances, TARGET_FPR, threshold)
     mitigated_metrics = _compute_metrics(genuine_distances, impostor_distances, adaptive_threshold)
 
-    overlap = _distribution_overlap(genuine_distances, impostor_distances)
+    overlap = distribution_overlap(genuine_distances, impostor_distances)
     d_prime_value = _d_prime(genuine_distances, impostor_distances)
 
     lookalike_risk = {
@@ -660,11 +1031,11 @@ def _audit_group(group: str, group_folder: str, threshold: float, use_preprocess
         "overlap": overlap,
         "dPrime": d_prime_value,
     }
-    if impostor_distances:
-        percentile = 5 if len(impostor_distances) >= 20 else 10
-        candidate = float(np.percentile(np.asarray(impostor_distances, dtype=np.float32), percentile))
+    if impostor_distances.size:
+        percentile = 5 if impostor_distances.size >= 20 else 10
+        candidate = float(np.percentile(impostor_distances, percentile))
         lookalike_threshold = float(min(threshold * LOOKALIKE_DISTANCE_RATIO, candidate))
-        rate = sum(1 for d in impostor_distances if d <= lookalike_threshold) / len(impostor_distances)
+        rate = np.count_nonzero(impostor_distances <= lookalike_threshold) / impostor_distances.size
         lookalike_risk["threshold"] = lookalike_threshold
         lookalike_risk["rate"] = float(rate)
 
@@ -676,9 +1047,9 @@ def _audit_group(group: str, group_folder: str, threshold: float, use_preprocess
     if baseline_metrics.get("threshold"):
         genuine_mean = None
         impostor_mean = None
-        if genuine_distances:
+        if genuine_distances.size:
             genuine_mean = float(1.0 - np.mean(genuine_distances))
-        if impostor_distances:
+        if impostor_distances.size:
             impostor_mean = float(1.0 - np.mean(impostor_distances))
         calibrated_similarity = {
             "genuineMean": genuine_mean,
@@ -740,15 +1111,92 @@ def _overall_fairness_score(group_results: List[dict], use_mitigation: bool):
     return int(round(score * 100))
 
 
+def _audit_response_key(threshold: float, use_preprocessing: bool, max_pairs: int, seed: int) -> str:
+    digest = hashlib.sha1(
+        "|".join(
+            [
+                _embedding_settings(use_preprocessing),
+                repr(float(threshold)),
+                str(max_pairs),
+                str(seed),
+                repr(TARGET_FPR),
+            ]
+        ).encode("utf-8")
+    )
+    for group in GROUPS:
+        group_folder = os.path.join(DATASET_PATH, group)
+        if not os.path.isdir(group_folder):
+            continue
+        for root, dirs, files in os.walk(group_folder):
+            dirs.sort()
+            for name in sorted(files):
+                if not _is_image_file(name):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                relative = os.path.relpath(path, DATASET_PATH)
+                digest.update(f"\n{relative}|{stat.st_size}|{stat.st_mtime_ns}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _store_audit_thresholds(group_results: List[dict]):
+    AUDIT_CACHE["timestamp"] = datetime.utcnow().isoformat() + "Z"
+    group_thresholds = {g["group"]: g["mitigation"]["threshold"] for g in group_results}
+    AUDIT_CACHE["compare_thresholds"] = {
+        group: (threshold, threshold * LOOKALIKE_DISTANCE_RATIO)
+        for group, threshold in group_thresholds.items()
+    }
+    AUDIT_CACHE["group_thresholds"] = group_thresholds
+    AUDIT_CACHE["calibration"] = {
+        g["group"]: g["mitigation"].get("calibratedSimilarity") for g in group_results
+    }
+
+
+def _cached_fairness_audit(threshold: float, use_preprocessing: bool, max_pairs: int, seed: int):
+    response_key = _audit_response_key(threshold, use_preprocessing, max_pairs, seed)
+    cached_key, cached = AUDIT_CACHE["response"] or (None, None)
+    if cached and cached_key == response_key:
+        _store_audit_thresholds(cached["groups"])
+        return {**cached, "timestamp": datetime.utcnow().isoformat() + "Z"}
+
+    result = _run_fairness_audit(threshold, use_preprocessing, max_pairs, seed)
+    if result:
+        AUDIT_CACHE["response"] = (response_key, result)
+        return dict(result)
+    return result
+
+
 def _run_fairness_audit(threshold: float, use_preprocessing: bool, max_pairs: int, seed: int):
     rng = random.Random(seed)
     group_results = []
 
+    group_identities = []
     for group in GROUPS:
         group_folder = os.path.join(DATASET_PATH, group)
         if not os.path.isdir(group_folder):
             continue
-        group_result = _audit_group(group, group_folder, threshold, use_preprocessing, max_pairs, rng)
+        identities = _collect_identities(group_folder, MAX_AUDIT_SAMPLES_PER_GROUP, rng)
+        if identities:
+            group_identities.append((group, identities))
+
+    paths = [
+        path
+        for _, identities in group_identities
+        for paths in identities.values()
+        for path in paths
+    ]
+    results = _get_cached_embeddings(paths, use_preprocessing)
+
+    offset = 0
+    for group, identities in group_identities:
+        count = sum(len(paths) for paths in identities.values())
+        group_result = _audit_group(
+            group, identities, results[offset:offset + count], threshold, max_pairs, rng
+        )
+        offset += count
         if group_result:
             group_results.append(group_result)
 
@@ -772,12 +1220,7 @@ def _run_fairness_audit(threshold: float, use_preprocessing: bool, max_pairs: in
     baseline_score = _overall_fairness_score(group_results, use_mitigation=False)
     mitigated_score = _overall_fairness_score(group_results, use_mitigation=True)
 
-    thresholds = {g["group"]: g["mitigation"]["threshold"] for g in group_results}
-    calibration = {g["group"]: g["mitigation"].get("calibratedSimilarity") for g in group_results}
-
-    AUDIT_CACHE["timestamp"] = datetime.utcnow().isoformat() + "Z"
-    AUDIT_CACHE["group_thresholds"] = thresholds
-    AUDIT_CACHE["calibration"] = calibration
+    _store_audit_thresholds(group_results)
 
     return {
         "groups": group_results,
@@ -820,53 +1263,192 @@ def _run_fairness_audit(threshold: float, use_preprocessing: bool, max_pairs: in
     }
 
 
-def _load_group_embeddings(group_folder, limit, use_preprocessing: bool):
+def _group_images(group_folder: str, limit) -> List[str]:
     images = _list_image_paths(group_folder)
     if limit and limit > 0:
         images = images[:limit]
-    embeddings = []
+    return images
+
+
+def _load_group_embeddings(images: List[str], use_preprocessing: bool) -> Tuple[np.ndarray, bool]:
+    results = _get_cached_embeddings(images, use_preprocessing)
+    settled = all(_is_settled(embedding, metadata) for embedding, metadata in results)
+    embeddings = [
+        embedding
+        for embedding, metadata in results
+        if metadata.get("detected") and embedding is not None
+    ]
+    if not embeddings:
+        return np.empty((0, 0), dtype=np.float32), settled
+    return np.stack(embeddings).astype(np.float32), settled
+
+
+def _quantize_reference(embeddings: np.ndarray) -> np.ndarray:
+    if REFERENCE_DTYPE == "int8":
+        peak = np.abs(embeddings).max(axis=1, keepdims=True, initial=0.0)
+        return np.round(embeddings * (127.0 / np.maximum(peak, 1e-9))).astype(np.int8)
+    return embeddings.astype(REFERENCE_DTYPE)
+
+
+def _group_centroid(normalized_embeddings: np.ndarray) -> np.ndarray:
+    return _l2_normalize(normalized_embeddings.mean(axis=0, dtype=np.float32))
+
+
+def _group_reference_key(images: List[str], use_preprocessing: bool) -> str:
+    settings = f"{_embedding_settings(use_preprocessing)}|{REFERENCE_DTYPE}"
+    digest = hashlib.sha256(settings.encode("utf-8"))
     for img_path in images:
-        embedding, metadata = _get_cached_embedding(img_path, use_preprocessing)
-        if metadata.get("detected") and embedding is not None:
-            embeddings.append(embedding)
-    return embeddings
+        try:
+            stat = os.stat(img_path)
+        except OSError:
+            continue
+        digest.update(f"\n{os.path.basename(img_path)}|{stat.st_size}|{stat.st_mtime_ns}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _load_group_matrix(group: str, images: List[str], reference_key: str, use_preprocessing: bool):
+    prefix = f"group_{secure_filename(group)}_"
+    matrix_path = os.path.join(CACHE_DIR, f"{prefix}{reference_key}.npy")
+    if ENABLE_EMBEDDING_CACHE and os.path.exists(matrix_path):
+        try:
+            return np.load(matrix_path, mmap_mode="r"), True
+        except (OSError, ValueError):
+            pass
+
+    embeddings, settled = _load_group_embeddings(images, use_preprocessing)
+    matrix = _quantize_reference(embeddings)
+    if ENABLE_EMBEDDING_CACHE and settled:
+        stale_pattern = re.compile(rf"{re.escape(prefix)}[0-9a-f]{{{len(reference_key)}}}\.npy")
+        for name in os.listdir(CACHE_DIR):
+            if stale_pattern.fullmatch(name):
+                try:
+                    os.remove(os.path.join(CACHE_DIR, name))
+                except OSError:
+                    pass
+        try:
+            _write_atomic(matrix_path, lambda handle: np.save(handle, matrix))
+        except OSError:
+            pass
+    return matrix, settled
+
+
+def _group_listing(group_folder: str, limit, use_preprocessing: bool):
+    try:
+        mtime_ns = os.stat(group_folder).st_mtime_ns
+    except OSError:
+        mtime_ns = None
+    listing_key = (group_folder, limit, bool(use_preprocessing))
+    cached = GROUP_LISTINGS.get(listing_key)
+    if cached is not None and mtime_ns is not None and cached[0] == mtime_ns:
+        return cached[1], cached[2]
+
+    images = _group_images(group_folder, limit)
+    reference_key = _group_reference_key(images, use_preprocessing)
+    GROUP_LISTINGS[listing_key] = (mtime_ns, images, reference_key)
+    return images, reference_key
+
+
+def _load_group_reference(group: str, group_folder: str, limit, use_preprocessing: bool):
+    images, reference_key = _group_listing(group_folder, limit, use_preprocessing)
+    if GROUP_REFERENCE_KEYS.get(group) != reference_key:
+        matrix, settled = _load_group_matrix(group, images, reference_key, use_preprocessing)
+        GROUP_EMBEDDINGS[group] = matrix
+        rows = _l2_normalize(matrix) if matrix.dtype == np.int8 else matrix
+        GROUP_CENTROIDS[group] = _group_centroid(rows) if len(matrix) else None
+        GROUP_REFERENCE_KEYS[group] = reference_key if settled else None
+    return GROUP_EMBEDDINGS[group], GROUP_CENTROIDS[group]
+
+
+def _load_reference_centroids():
+    with REFERENCE_LOCK:
+        groups = []
+        centroids = []
+        sample_counts = []
+        for group in GROUPS:
+            group_folder = os.path.join(DATASET_PATH, group)
+            if not os.path.isdir(group_folder):
+                continue
+            reference, centroid = _load_group_reference(
+                group, group_folder, MAX_REFERENCE_SAMPLES_PER_GROUP, True
+            )
+            if centroid is None:
+                continue
+            groups.append(group)
+            centroids.append(centroid)
+            sample_counts.append(len(reference))
+
+        keys = tuple(GROUP_REFERENCE_KEYS[group] for group in groups)
+        if None in keys or REFERENCE_CENTROIDS["keys"] != keys:
+            REFERENCE_CENTROIDS["keys"] = keys
+            REFERENCE_CENTROIDS["groups"] = groups
+            REFERENCE_CENTROIDS["matrix"] = np.stack(centroids) if centroids else None
+            REFERENCE_CENTROIDS["sampleCounts"] = sample_counts
+        return (
+            REFERENCE_CENTROIDS["groups"],
+            REFERENCE_CENTROIDS["matrix"],
+            REFERENCE_CENTROIDS["sampleCounts"],
+        )
+
+
+def _bool_param(name: str) -> bool:
+    return request.values.get(name, "").lower() in TRUTHY_VALUES
+
+
+def _json(payload):
+    if orjson is not None:
+        try:
+            return app.response_class(
+                orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY),
+                mimetype="application/json",
+            )
+        except TypeError:
+            pass
+    return jsonify(payload)
 
 
 @app.after_request
 def add_security_headers(response):
-    response.headers["Cache-Control"] = "no-store"
-    response.headers["Pragma"] = "no-cache"
+    if "Cache-Control" not in response.headers:
+        response.headers["Cache-Control"] = "no-store"
+        response.headers["Pragma"] = "no-cache"
     response.headers["X-Content-Type-Options"] = "nosniff"
     return response
 
 
 @app.route("/api/health", methods=["GET"])
 def health_check():
-    return jsonify({
+    config = {
         "status": "ok",
         "model": MODEL_NAME,
         "detectorBackend": DETECTOR_BACKEND,
+        "gpuCount": len(GPU_DEVICES),
         "groups": GROUPS,
         "groupDefinitions": GROUP_DEFINITIONS,
         "preprocessing": {
             "enabled": ENABLE_PREPROCESSING,
             "method": PREPROCESS_METHOD,
         },
-        "timestamp": datetime.utcnow().isoformat() + "Z",
-    })
+    }
+    etag = hashlib.blake2b(json.dumps(config, sort_keys=True).encode("utf-8"), digest_size=8).hexdigest()
+    response = _json({**config, "timestamp": datetime.utcnow().isoformat() + "Z"})
+    response.headers["Cache-Control"] = "no-cache"
+    response.set_etag(etag, weak=True)
+    return response.make_conditional(request)
 
 
 @app.route("/api/analyze-face", methods=["POST"])
 def analyze_face():
     if "image" not in request.files:
-        return jsonify({"error": "No image uploaded"}), 400
+        return _json({"error": "No image uploaded"}), 400
 
-    file = request.files["image"]
-    temp_path = _save_upload(file, "analysis")
+    upload = _read_upload(request.files["image"], "analysis")
     start_time = time.time()
 
     try:
-        embedding, metadata = _get_embedding_with_metadata(temp_path, use_preprocessing=True)
+        results = _get_upload_embeddings([upload])
+        if results is None:
+            return _json({"error": "Unable to decode image"}), 400
+        embedding, metadata = results[0]
         embedding_size = len(embedding) if embedding is not None else 0
 
         response = {
@@ -885,27 +1467,25 @@ def analyze_face():
         if metadata.get("detected"):
             response["confidence"] = float(metadata.get("confidence") or 0.0)
 
-        return jsonify(response)
+        return _json(response)
     except Exception as exc:
-        return jsonify({"error": f"Analysis failed: {str(exc)}"}), 500
-    finally:
-        _cleanup(temp_path)
+        return _json({"error": f"Analysis failed: {str(exc)}"}), 500
 
 
 @app.route("/api/compare-faces", methods=["POST"])
 def compare_faces():
     if "image1" not in request.files or "image2" not in request.files:
-        return jsonify({"error": "Both image1 and image2 are required"}), 400
+        return _json({"error": "Both image1 and image2 are required"}), 400
 
-    file1 = request.files["image1"]
-    file2 = request.files["image2"]
-    path1 = _save_upload(file1, "compare1")
-    path2 = _save_upload(file2, "compare2")
+    upload1 = _read_upload(request.files["image1"], "compare1")
+    upload2 = _read_upload(request.files["image2"], "compare2")
     start_time = time.time()
 
     try:
-        embedding1, meta1 = _get_embedding_with_metadata(path1, use_preprocessing=True)
-        embedding2, meta2 = _get_embedding_with_metadata(path2, use_preprocessing=True)
+        results = _get_upload_embeddings([upload1, upload2], require_all=True)
+        if results is None:
+            return _json({"error": "Unable to decode one or both images"}), 400
+        (embedding1, meta1), (embedding2, meta2) = results
 
         face1_detected = bool(meta1.get("detected"))
         face2_detected = bool(meta2.get("detected"))
@@ -913,21 +1493,20 @@ def compare_faces():
         cosine_similarity = 0.0
         distance = None
         is_match = False
+        twin_flag = False
         calibrated_similarity = 0.0
         warnings = []
 
         threshold_source = "standard"
         threshold_used = STANDARD_THRESHOLD
+        lookalike_threshold = STANDARD_LOOKALIKE_THRESHOLD
 
-        requested_group = request.form.get("group") or request.args.get("group")
-        use_adaptive = str(
-            request.form.get("useAdaptiveThreshold")
-            or request.args.get("useAdaptiveThreshold")
-            or ""
-        ).lower() in ("1", "true", "yes")
+        requested_group = request.values.get("group")
+        use_adaptive = _bool_param("useAdaptiveThreshold")
 
-        if use_adaptive and requested_group in AUDIT_CACHE.get("group_thresholds", {}):
-            threshold_used = AUDIT_CACHE["group_thresholds"][requested_group]
+        adaptive_thresholds = AUDIT_CACHE["compare_thresholds"].get(requested_group) if use_adaptive else None
+        if adaptive_thresholds is not None:
+            threshold_used, lookalike_threshold = adaptive_thresholds
             threshold_source = "adaptive"
 
         if not face1_detected or not face2_detected:
@@ -937,13 +1516,11 @@ def compare_faces():
         else:
             distance = _cosine_distance(embedding1, embedding2)
             cosine_similarity = max(0.0, 1.0 - distance)
-            is_match = bool(distance <= threshold_used)
+            is_match = distance <= threshold_used
+            twin_flag = distance <= lookalike_threshold
             calibrated_similarity = _calibrated_similarity(distance, threshold_used)
 
-        lookalike_threshold = threshold_used * LOOKALIKE_DISTANCE_RATIO
-        twin_flag = bool(distance is not None and distance <= lookalike_threshold)
-
-        return jsonify({
+        return _json({
             "face1Detected": face1_detected,
             "face2Detected": face2_detected,
             "cosineSimilarity": float(cosine_similarity),
@@ -965,57 +1542,49 @@ def compare_faces():
             "warnings": warnings,
         })
     except Exception as exc:
-        return jsonify({"error": f"Comparison failed: {str(exc)}"}), 500
-    finally:
-        _cleanup([path1, path2])
+        return _json({"error": f"Comparison failed: {str(exc)}"}), 500
 
 
 @app.route("/api/predict-demographic", methods=["POST"])
 def predict_demographic():
     if "image" not in request.files:
-        return jsonify({"error": "No image uploaded"}), 400
+        return _json({"error": "No image uploaded"}), 400
 
-    file = request.files["image"]
-    temp_path = _save_upload(file, "affinity")
+    upload = _read_upload(request.files["image"], "affinity")
     start_time = time.time()
 
     try:
-        embedding, metadata = _get_embedding_with_metadata(temp_path, use_preprocessing=True)
+        results = _get_upload_embeddings([upload])
+        if results is None:
+            return _json({"error": "Unable to decode image"}), 400
+        embedding, metadata = results[0]
         if embedding is None:
-            return jsonify({"error": "Unable to generate embedding"}), 500
+            return _json({"error": "Unable to generate embedding"}), 500
 
-        distances = []
-        for group in GROUPS:
-            group_folder = os.path.join(DATASET_PATH, group)
-            if not os.path.isdir(group_folder):
-                continue
+        groups, centroid_matrix, sample_counts = _load_reference_centroids()
+        if not groups:
+            return _json({"error": "No reference images found"}), 500
 
-            embeddings = _load_group_embeddings(group_folder, MAX_REFERENCE_SAMPLES_PER_GROUP, True)
-            if not embeddings:
-                continue
-
-            centroid = np.mean(np.asarray(embeddings, dtype=np.float32), axis=0)
-            distance = _cosine_distance(embedding, centroid)
-            thresholds = AUDIT_CACHE.get("group_thresholds", {})
+        group_distances = 1.0 - centroid_matrix @ embedding
+        thresholds = AUDIT_CACHE["group_thresholds"]
+        distances = []
+        for group, distance, sample_count in zip(groups, group_distances.tolist(), sample_counts):
             group_threshold = thresholds.get(group, STANDARD_THRESHOLD)
-
             distances.append({
                 "group": group,
-                "averageDistance": float(distance),
-                "sampleCount": int(len(embeddings)),
+                "averageDistance": distance,
+                "sampleCount": sample_count,
                 "isAboveThreshold": distance >= group_threshold,
                 "threshold": float(group_threshold),
             })
 
-        if not distances:
-            return jsonify({"error": "No reference images found"}), 500
-
-        distances_sorted = sorted(distances, key=lambda d: d["averageDistance"])
-        best_match = distances_sorted[0]
+        ranked = np.argpartition(group_distances, min(1, len(group_distances) - 1))[:2]
+        ranked = ranked[np.argsort(group_distances[ranked])]
+        best_match = distances[ranked[0]]
         predicted_group = best_match["group"]
         min_distance = float(best_match["averageDistance"])
 
-        runner_up = distances_sorted[1]["averageDistance"] if len(distances_sorted) > 1 else None
+        runner_up = distances[ranked[1]]["averageDistance"] if len(ranked) > 1 else None
         confidence_score = 0.0
         if runner_up is not None and runner_up > 0:
             confidence_score = max(0.0, 1.0 - (min_distance / runner_up))
@@ -1024,14 +1593,14 @@ def predict_demographic():
 
         threshold_used = float(best_match.get("threshold", STANDARD_THRESHOLD))
 
-        return jsonify({
+        return _json({
             "predictedGroup": predicted_group,
             "confidenceScore": float(confidence_score),
             "distances": distances,
             "referenceDecision": {
                 "threshold": float(threshold_used),
                 "withinThreshold": bool(min_distance <= threshold_used),
-                "thresholdSource": "adaptive" if predicted_group in AUDIT_CACHE.get("group_thresholds", {}) else "standard",
+                "thresholdSource": "adaptive" if predicted_group in thresholds else "standard",
                 "note": "Thresholds are calibrated for verification audits and are informational only in this view.",
             },
             "disclaimer": (
@@ -1043,9 +1612,7 @@ def predict_demographic():
             "processingTime": float(time.time() - start_time),
         })
     except Exception as exc:
-        return jsonify({"error": f"Affinity analysis failed: {str(exc)}"}), 500
-    finally:
-        _cleanup(temp_path)
+        return _json({"error": f"Affinity analysis failed: {str(exc)}"}), 500
 
 
 @app.route("/api/fairness-audit", methods=["POST"])
@@ -1058,9 +1625,9 @@ def fairness_audit():
     max_pairs = int(payload.get("maxPairs", MAX_PAIRS_PER_GROUP))
     seed = int(payload.get("seed", RNG_SEED))
 
-    result = _run_fairness_audit(threshold, use_preprocessing, max_pairs, seed)
+    result = _cached_fairness_audit(threshold, use_preprocessing, max_pairs, seed)
     if not result:
-        return jsonify({"error": "No reference images found for audit"}), 500
+        return _json({"error": "No reference images found for audit"}), 500
 
     result["processingTime"] = float(time.time() - start_time)
     result["overallFairnessScore"] = result["overall"]["baselineScore"]
@@ -1079,9 +1646,21 @@ def fairness_audit():
         "dataset": "Local reference sets in backend/dataset",
     }
 
-    return jsonify(result)
+    return _json(result)
 
 
 if __name__ == "__main__":
-    print("FairFace Insight API running on http://localhost:5000")
-    app.run(port=5000, debug=True)
+    debug = os.getenv("FLASK_DEBUG", "false").lower() in TRUTHY_VALUES
+    if WARMUP_MODELS and (not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true"):
+        _warm_up_models()
+    host = os.getenv("HOST", "127.0.0.1")
+    port = int(os.getenv("PORT", "5000"))
+    print(f"FairFace Insight API running on http://localhost:{port}")
+    try:
+        from waitress import serve
+    except ImportError:
+        serve = None
+    if serve is not None and not debug:
+        serve(app, host=host, port=port, threads=int(os.getenv("SERVER_THREADS", str(max(4, os.cpu_count() or 1)))))
+    else:
+        app.run(host=host, port=port, debug=debug, threaded=True)
@@ -0,0 +1,59 @@
+import random
+from typing import List
+
+import numpy as np
+
+
+def sample_impostor_pairs(labels: np.ndarray, count: int, generator: np.random.Generator):
+    size = labels.size
+    chosen = np.empty(0, dtype=np.int64)
+    while chosen.size < count:
+        rows = generator.integers(0, size, size=2 * count)
+        cols = generator.integers(0, size, size=2 * count)
+        different = labels[rows] != labels[cols]
+        low = np.minimum(rows[different], cols[different])
+        high = np.maximum(rows[different], cols[different])
+        chosen = np.unique(np.concatenate((chosen, low * size + high)))
+    return np.divmod(generator.permutation(chosen)[:count], size)
+
+
+def pair_distances(embeddings: np.ndarray, counts: List[int], max_pairs: int, rng: random.Random):
+    labels = np.repeat(np.arange(len(counts)), counts)
+    if labels.size < 2:
+        empty = np.empty(0, dtype=np.float32)
+        return empty, empty
+
+    offsets = np.cumsum([0] + counts)
+    genuine = [
+        (1.0 - block @ block.T)[np.triu_indices(len(block), k=1)]
+        for block in (embeddings[start:end] for start, end in zip(offsets[:-1], offsets[1:]))
+    ]
+    genuine_distances = np.concatenate(genuine)
+
+    impostor_total = labels.size * (labels.size - 1) // 2 - genuine_distances.size
+    if 0 < max_pairs and impostor_total > 4 * max_pairs:
+        generator = np.random.default_rng(rng.getrandbits(64))
+        rows, cols = sample_impostor_pairs(labels, max_pairs, generator)
+        impostor_distances = 1.0 - np.einsum("ij,ij->i", embeddings[rows], embeddings[cols])
+    else:
+        rows, cols = np.triu_indices(labels.size, k=1)
+        different = labels[rows] != labels[cols]
+        rows, cols = rows[different], cols[different]
+        impostor_distances = 1.0 - (embeddings @ embeddings.T)[rows, cols]
+    return genuine_distances, impostor_distances
+
+
+def distribution_overlap(genuine: np.ndarray, impostor: np.ndarray, bins: int = 20):
+    if genuine.size == 0 or impostor.size == 0:
+        return None
+    values = np.concatenate((genuine, impostor))
+    indices = np.floor(values * bins).astype(np.intp)
+    indices[values == 1.0] = bins - 1
+    in_range = (indices >= 0) & (indices < bins)
+    indices[genuine.size:] += bins
+    counts = np.bincount(indices[in_range], minlength=2 * bins).reshape(2, bins)
+    totals = counts.sum(axis=1, keepdims=True)
+    if not totals.all():
+        return None
+    overlap = float(np.sum(np.minimum(*(counts / totals))))
+    return overlap
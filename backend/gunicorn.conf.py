@@ -0,0 +1,16 @@
+import os
+
+chdir = os.path.dirname(os.path.abspath(__file__))
+wsgi_app = "app:app"
+bind = os.getenv("BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "2"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "300"))
+
+
+def post_worker_init(worker):
+    from app import WARMUP_MODELS, _warm_up_models
+
+    if WARMUP_MODELS:
+        _warm_up_models()
@@ -0,0 +1,82 @@
+import os
+import random
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audit_stats import distribution_overlap, pair_distances, sample_impostor_pairs  # noqa: E402
+
+
+def _histogram_overlap(genuine, impostor, bins=20):
+    g_counts, edges = np.histogram(genuine, bins=bins, range=(0, 1), density=True)
+    i_counts, _ = np.histogram(impostor, bins=edges, density=True)
+    return float(np.sum(np.minimum(g_counts, i_counts)) * (edges[1] - edges[0]))
+
+
+def _unit_rows(rng, count, dim=16):
+    rows = rng.normal(size=(count, dim)).astype(np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def test_overlap_matches_histogram_density():
+    rng = np.random.default_rng(0)
+    genuine = rng.uniform(0.0, 0.8, size=500).astype(np.float32)
+    impostor = rng.uniform(0.4, 1.0, size=700).astype(np.float32)
+    assert np.isclose(distribution_overlap(genuine, impostor), _histogram_overlap(genuine, impostor))
+
+
+def test_overlap_ignores_out_of_range_values_like_histogram():
+    rng = np.random.default_rng(1)
+    genuine = np.concatenate([rng.uniform(0.0, 1.0, size=300), [-0.2, 1.0, 1.5]]).astype(np.float32)
+    impostor = np.concatenate([rng.uniform(0.3, 1.0, size=300), [0.0, 1.0, 1.9, -0.01]]).astype(np.float32)
+    assert np.isclose(distribution_overlap(genuine, impostor), _histogram_overlap(genuine, impostor))
+
+
+def test_overlap_is_none_for_empty_input():
+    values = np.array([0.5], dtype=np.float32)
+    assert distribution_overlap(np.empty(0, dtype=np.float32), values) is None
+    assert distribution_overlap(values, np.empty(0, dtype=np.float32)) is None
+
+
+def test_sampled_impostor_pairs_are_distinct_and_cross_identity():
+    labels = np.repeat(np.arange(12), 5)
+    rows, cols = sample_impostor_pairs(labels, 400, np.random.default_rng(2))
+    assert rows.size == cols.size == 400
+    assert np.all(rows < cols)
+    assert np.all(labels[rows] != labels[cols])
+    assert len(set(zip(rows.tolist(), cols.tolist()))) == 400
+
+
+def test_pair_distances_sampled_path_stays_cross_identity():
+    rng = np.random.default_rng(3)
+    counts = [4] * 30
+    embeddings = _unit_rows(rng, sum(counts))
+    genuine, impostor = pair_distances(embeddings, counts, 100, random.Random(3))
+    assert genuine.size == 30 * 4 * 3 // 2
+    assert impostor.size == 100
+    assert np.all((impostor >= -1e-5) & (impostor <= 2.0 + 1e-5))
+
+
+def test_pair_distances_full_path_counts_every_pair():
+    rng = np.random.default_rng(4)
+    counts = [3, 1, 4, 2]
+    n = sum(counts)
+    embeddings = _unit_rows(rng, n)
+    genuine, impostor = pair_distances(embeddings, counts, 0, random.Random(4))
+    expected_genuine = sum(count * (count - 1) // 2 for count in counts)
+    assert genuine.size == expected_genuine
+    assert genuine.size + impostor.size == n * (n - 1) // 2
+
+    labels = np.repeat(np.arange(len(counts)), counts)
+    rows, cols = np.triu_indices(n, k=1)
+    distances = 1.0 - np.sum(embeddings[rows] * embeddings[cols], axis=1)
+    same = labels[rows] == labels[cols]
+    assert np.allclose(np.sort(genuine), np.sort(distances[same]), atol=1e-6)
+    assert np.allclose(np.sort(impostor), np.sort(distances[~same]), atol=1e-6)
+
+
+def test_pair_distances_handles_single_sample():
+    genuine, impostor = pair_distances(np.ones((1, 4), dtype=np.float32), [1], 10, random.Random(0))
+    assert genuine.size == 0 and impostor.size == 0
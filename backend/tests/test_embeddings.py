@@ -0,0 +1,36 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+pytest.importorskip("deepface")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+from deepface import DeepFace  # noqa: E402
+
+SAMPLE_IMAGE = os.path.join(app.DATASET_PATH, "Asian", "i1.jpg")
+
+
+def test_batch_embedding_matches_deepface_represent():
+    image = app._read_image(SAMPLE_IMAGE)
+    assert image is not None
+
+    backend = app._detector_backends()[0]
+    faces = app._extract_faces(image, backend)
+    assert faces, "no face detected in bundled sample"
+
+    batch_embedding = app._represent_batch([faces[0]["face"]])[0]
+    assert batch_embedding is not None
+
+    representation = DeepFace.represent(
+        img_path=image,
+        model_name=app.MODEL_NAME,
+        detector_backend=backend,
+        enforce_detection=False,
+    )[0]["embedding"]
+    reference = app._l2_normalize(representation)
+
+    assert float(np.dot(batch_embedding, reference)) > 0.999